@@ -8,9 +8,12 @@ Includes automatic call recording.
 """
 
 import os
+import re
+import json
 import logging
 import time
 import asyncio
+from functools import cached_property, lru_cache
 from dotenv import load_dotenv
 
 from livekit import api, rtc
@@ -18,13 +21,12 @@ from livekit.agents import (
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
     RunContext,
     WorkerOptions,
     function_tool,
     cli,
 )
-from livekit.plugins import xai
-
 from tools import (
     InventoryTools,
     LeadTools,
@@ -33,21 +35,139 @@ from tools import (
     get_ai_agent_settings,
     get_dealer_voice_agent_by_phone,
     build_dealer_instructions,
+    build_after_hours_instructions,
     increment_dealer_minutes,
     update_lead_with_recording,
+    finalize_call,
     is_within_business_hours,
     validate_e164_phone,
+    run_db,
     transcribe_call_recording,
     summarize_call,
 )
 
 load_dotenv()
 
+# Resolved once at import; the environment doesn't change over a worker's life
+XAI_API_KEY = os.getenv("XAI_API_KEY")
+LIVEKIT_URL = os.getenv("LIVEKIT_URL")
+LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY")
+LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET")
+LIVEKIT_SIP_TRUNK_ID = os.getenv("LIVEKIT_SIP_TRUNK_ID", "")
+
+# Supabase storage config for call recordings, derived once.
+# Supabase S3 uses project_ref as access_key and service_role_key as secret
+# See: https://supabase.com/docs/guides/storage/s3/authentication
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+SUPABASE_PROJECT_REF = SUPABASE_URL.replace("https://", "").split(".")[0] if SUPABASE_URL else ""
+SUPABASE_S3_ENDPOINT = f"{SUPABASE_URL}/storage/v1/s3"
+RECORDING_ENABLED = bool(SUPABASE_PROJECT_REF and SUPABASE_SERVICE_ROLE_KEY)
+
+# Resolve the enum attribute chain once; checked for every participant on
+# every call join
+_SIP_KIND = rtc.ParticipantKind.PARTICIPANT_KIND_SIP
+
+# Single-pass extraction of the number from a SIP identity such as
+# "sip:+14155551212@host" (optional prefix, everything up to the first @)
+_SIP_IDENT_RE = re.compile(r'^(?:sip:)?([^@]*)')
+
 logger = logging.getLogger("axlon-agent")
 logger.setLevel(logging.INFO)
 
-# Track active calls for recording
-active_calls = {}
+
+def _setup_nonblocking_logging() -> None:
+    """Route agent log records through a queue so handler I/O (stderr under
+    backpressure) never blocks the event loop; a background thread drains it."""
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    # The queue handler bypasses the root handlers cli.run_app configures, so
+    # give the drain handler an equivalent format - raw messages with no
+    # timestamp/level/name are useless in production logs
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s %(name)s - %(message)s")
+    )
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+
+    queue_handler = QueueHandler(log_queue)
+    for name in ("axlon-agent", "axlon-agent.tools"):
+        agent_logger = logging.getLogger(name)
+        agent_logger.addHandler(queue_handler)
+        agent_logger.propagate = False
+
+
+_setup_nonblocking_logging()
+
+# Shared LiveKit API client. Recording start/stop and call transfers used to
+# build (and tear down) a fresh client per request, paying a TLS handshake
+# each time; one long-lived client reuses its connection pool for the life of
+# the worker process and is cleaned up at process exit.
+_livekit_api: api.LiveKitAPI | None = None
+_livekit_api_lock = asyncio.Lock()
+
+
+async def get_livekit_api() -> api.LiveKitAPI:
+    """Get the shared LiveKitAPI client (created lazily on first use)."""
+    global _livekit_api
+    if _livekit_api is None:
+        async with _livekit_api_lock:
+            if _livekit_api is None:
+                _livekit_api = api.LiveKitAPI(
+                    url=LIVEKIT_URL,
+                    api_key=LIVEKIT_API_KEY,
+                    api_secret=LIVEKIT_API_SECRET,
+                )
+    return _livekit_api
+
+# Keep strong references to fire-and-forget tasks so the event loop doesn't
+# garbage-collect them mid-flight
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _spawn_background(coro) -> asyncio.Task:
+    """Run a coroutine in the background without awaiting it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _log_staff_query(dealer_id: str, staff_id: str, query_type: str,
+                           query: str | None, result: str | None) -> None:
+    """Write the staff-access audit row off the voice-turn critical path."""
+    from tools import pg_insert
+    try:
+        # Direct PostgREST insert on the shared async client - no thread hop,
+        # no event-loop block from the sync supabase client
+        await pg_insert("dealer_staff_access_logs", {
+            "dealer_id": dealer_id,
+            "staff_id": staff_id,
+            "query_type": query_type,
+            "query": query[:500] if query else None,
+            "response_summary": result[:200] if result else None,
+            "auth_success": True,
+        })
+    except Exception as e:
+        logger.warning("Failed to log staff query: %s", e)
+
+
+# RealtimeModel instances hold session config, not a live connection, so one
+# per voice can be shared across calls; prewarm seeds the default voice and
+# dealer voices are added on first use
+_models_by_voice: dict[str, object] = {}
+
+# Tool instances are stateless apart from their dealer context, so the main
+# (no-dealer) line can share one instance across all calls. Dealer calls still
+# get per-call instances scoped to their dealer_id.
+_default_inventory_tools = InventoryTools()
+_default_lead_tools = LeadTools()
+
+# CallLogTools carries no per-call state at all, so every call shares one
+_call_log_tools = CallLogTools()
 
 
 class AxlonAgent(Agent):
@@ -74,11 +194,6 @@ class AxlonAgent(Agent):
         self.can_transfer = can_transfer
         self.transfer_number = transfer_number
 
-        # Initialize tools with dealer context if this is a dealer call
-        self.inventory_tools = InventoryTools(dealer_id=dealer_id)
-        self.lead_tools = LeadTools(dealer_id=dealer_id, business_name=business_name)
-        self.staff_auth_tools = StaffAuthTools(dealer_id=dealer_id) if dealer_id else None
-
         self.captured_lead_id = None
         self.caller_name = None
         self.interest = None
@@ -87,6 +202,32 @@ class AxlonAgent(Agent):
         self.is_staff_authenticated = False
         self.session = None  # Will be set after session starts
 
+        # Per-call state previously tracked in the module-level active_calls
+        # dict; set by entrypoint once recording/logging are established
+        self.egress_id = None
+        self.call_log_id = None
+        self.transferred = False
+        self.transfer_reason = None
+
+    # Tool helpers are built lazily on first use: callers who hang up during
+    # the greeting never pay for them. Dealer calls get instances scoped to
+    # their dealer_id; main-line calls share the module-level instances.
+    @cached_property
+    def inventory_tools(self) -> InventoryTools:
+        if self.dealer_id:
+            return InventoryTools(dealer_id=self.dealer_id)
+        return _default_inventory_tools
+
+    @cached_property
+    def lead_tools(self) -> LeadTools:
+        if self.dealer_id:
+            return LeadTools(dealer_id=self.dealer_id, business_name=self.business_name)
+        return _default_lead_tools
+
+    @cached_property
+    def staff_auth_tools(self) -> StaffAuthTools | None:
+        return StaffAuthTools(dealer_id=self.dealer_id) if self.dealer_id else None
+
     @function_tool()
     async def search_inventory(
         self,
@@ -173,9 +314,6 @@ class AxlonAgent(Agent):
         # Store lead ID for recording association
         if lead_id:
             self.captured_lead_id = lead_id
-            # Store in active_calls for later recording update
-            if self.room_name in active_calls:
-                active_calls[self.room_name]['lead_id'] = lead_id
 
         return result
 
@@ -256,21 +394,16 @@ class AxlonAgent(Agent):
             filters=filters if filters else None,
         )
 
-        # Log the query
+        # Log the query in the background - the caller shouldn't wait on an
+        # audit write before hearing the answer
         if self.staff_auth_tools.authenticated_staff:
-            from tools import get_supabase
-            try:
-                supabase = get_supabase()
-                supabase.table("dealer_staff_access_logs").insert({
-                    "dealer_id": self.dealer_id,
-                    "staff_id": self.staff_auth_tools.authenticated_staff['id'],
-                    "query_type": query_type,
-                    "query": query[:500] if query else None,
-                    "response_summary": result[:200] if result else None,
-                    "auth_success": True,
-                }).execute()
-            except Exception as e:
-                logger.warning(f"Failed to log staff query: {e}")
+            _spawn_background(_log_staff_query(
+                dealer_id=self.dealer_id,
+                staff_id=self.staff_auth_tools.authenticated_staff['id'],
+                query_type=query_type,
+                query=query,
+                result=result,
+            ))
 
         return result
 
@@ -294,28 +427,20 @@ class AxlonAgent(Agent):
         # Validate transfer number
         is_valid, normalized = validate_e164_phone(self.transfer_number)
         if not is_valid:
-            logger.error(f"Invalid transfer number configured: {self.transfer_number}")
+            logger.error("Invalid transfer number configured: %s", self.transfer_number)
             return "I'm sorry, I'm unable to transfer the call right now. Would you like me to take your information for a callback?"
 
-        try:
-            # Create SIP participant for transfer
-            livekit_api = api.LiveKitAPI(
-                url=os.getenv("LIVEKIT_URL"),
-                api_key=os.getenv("LIVEKIT_API_KEY"),
-                api_secret=os.getenv("LIVEKIT_API_SECRET"),
-            )
+        if not LIVEKIT_SIP_TRUNK_ID:
+            # Already logged at boot; keep the caller-facing fallback here
+            return "I'm sorry, call transfers are not configured. Would you like me to take your information for a callback?"
 
-            # Create outbound SIP call to transfer number
-            sip_trunk_id = os.getenv("LIVEKIT_SIP_TRUNK_ID", "")
-            if not sip_trunk_id:
-                logger.error("LIVEKIT_SIP_TRUNK_ID not configured for transfers")
-                await livekit_api.aclose()
-                return "I'm sorry, call transfers are not configured. Would you like me to take your information for a callback?"
+        try:
+            livekit_api = await get_livekit_api()
 
             # Create SIP participant (dial out to transfer number)
             await livekit_api.sip.create_sip_participant(
                 api.CreateSIPParticipantRequest(
-                    sip_trunk_id=sip_trunk_id,
+                    sip_trunk_id=LIVEKIT_SIP_TRUNK_ID,
                     sip_call_to=normalized,
                     room_name=self.room_name,
                     participant_identity=f"transfer-{normalized}",
@@ -323,51 +448,73 @@ class AxlonAgent(Agent):
                 )
             )
 
-            await livekit_api.aclose()
+            logger.info("Call transfer initiated to %s: %s", normalized, reason)
 
-            logger.info(f"Call transfer initiated to {normalized}: {reason}")
-
-            # Update call log with transfer info
-            if self.room_name in active_calls:
-                active_calls[self.room_name]['transferred'] = True
-                active_calls[self.room_name]['transfer_reason'] = reason
+            # Note transfer info for the call log
+            self.transferred = True
+            self.transfer_reason = reason
 
             return f"I'm connecting you now. Please hold while I transfer your call."
 
         except Exception as e:
-            logger.error(f"Error transferring call: {e}")
+            logger.error("Error transferring call: %s", e)
             return "I'm sorry, I wasn't able to complete the transfer. Would you like me to take your information so someone can call you back?"
 
 
+# Voice calls are mono narrowband speech, so the egress encoder defaults
+# (stereo, high bitrate) waste CPU and storage. Env-overridable for tuning.
+RECORDING_AUDIO_BITRATE = int(os.getenv("RECORDING_AUDIO_BITRATE", "32"))
+RECORDING_AUDIO_FREQUENCY = int(os.getenv("RECORDING_AUDIO_FREQUENCY", "16000"))
+
+# S3 upload config is identical for every recording; build the protobuf once
+# and share it (assigning it into EncodedFileOutput copies the message, so
+# the shared template is never mutated)
+_s3_upload = api.S3Upload(
+    access_key=SUPABASE_PROJECT_REF,
+    secret=SUPABASE_SERVICE_ROLE_KEY,
+    bucket="call-recordings",
+    region="us-east-1",  # Required by S3 protocol but Supabase ignores it
+    endpoint=SUPABASE_S3_ENDPOINT,
+    force_path_style=True,
+) if RECORDING_ENABLED else None
+
+
+# Circuit breaker around egress start. Recording is best-effort: when the
+# LiveKit egress service is slow or down, repeated timeouts would otherwise
+# delay every call's setup by the full timeout. After a few failures in a
+# short window, skip recording entirely until the cooldown passes.
+EGRESS_START_TIMEOUT = float(os.getenv("EGRESS_START_TIMEOUT", "1.5"))
+_EGRESS_BREAKER_THRESHOLD = 3
+_EGRESS_BREAKER_WINDOW = 30.0
+_egress_fail_count = 0
+_egress_first_fail_at = 0.0
+_egress_open_until = 0.0
+
+
+def _record_egress_failure() -> None:
+    """Count an egress-start failure; open the breaker past the threshold."""
+    global _egress_fail_count, _egress_first_fail_at, _egress_open_until
+    now = time.monotonic()
+    if now - _egress_first_fail_at > _EGRESS_BREAKER_WINDOW:
+        _egress_first_fail_at = now
+        _egress_fail_count = 0
+    _egress_fail_count += 1
+    if _egress_fail_count >= _EGRESS_BREAKER_THRESHOLD:
+        _egress_open_until = now + _EGRESS_BREAKER_WINDOW
+        logger.error("Egress failing repeatedly - disabling recording for %ss",
+                     int(_EGRESS_BREAKER_WINDOW))
+
+
 async def start_recording(ctx: JobContext) -> str | None:
     """Start recording the call using LiveKit Egress."""
+    global _egress_fail_count
     try:
-        livekit_api = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET"),
-        )
-
-        # Get Supabase project ref from URL (e.g., https://abc123.supabase.co -> abc123)
-        supabase_url = os.getenv("SUPABASE_URL", "")
-        project_ref = supabase_url.replace("https://", "").split(".")[0] if supabase_url else ""
-        service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
-
-        # Configure S3-compatible upload for Supabase Storage
-        # Supabase S3 uses project_ref as access_key and service_role_key as secret
-        # See: https://supabase.com/docs/guides/storage/s3/authentication
-        s3_upload = api.S3Upload(
-            access_key=project_ref,
-            secret=service_role_key,
-            bucket="call-recordings",
-            region="us-east-1",  # Required by S3 protocol but Supabase ignores it
-            endpoint=f"{supabase_url}/storage/v1/s3",
-            force_path_style=True,
-        )
-
-        if not project_ref or not service_role_key:
+        if not RECORDING_ENABLED:
             logger.warning("Missing Supabase credentials for recording - skipping")
-            await livekit_api.aclose()
+            return None
+
+        if time.monotonic() < _egress_open_until:
+            logger.warning("Egress circuit open - skipping recording for this call")
             return None
 
         # Start room composite egress (records audio)
@@ -379,105 +526,123 @@ async def start_recording(ctx: JobContext) -> str | None:
                 api.EncodedFileOutput(
                     file_type=api.EncodedFileType.MP3,
                     filepath=filename,
-                    s3=s3_upload,
+                    s3=_s3_upload,
                 )
             ],
+            advanced=api.EncodingOptions(
+                audio_bitrate=RECORDING_AUDIO_BITRATE,
+                audio_frequency=RECORDING_AUDIO_FREQUENCY,
+                audio_channels=1,
+            ),
         )
 
-        egress_info = await livekit_api.egress.start_room_composite_egress(egress_request)
-        logger.info(f"Started recording: {egress_info.egress_id}")
+        livekit_api = await get_livekit_api()
+        egress_info = await asyncio.wait_for(
+            livekit_api.egress.start_room_composite_egress(egress_request),
+            timeout=EGRESS_START_TIMEOUT,
+        )
+        logger.info("Started recording: %s", egress_info.egress_id)
 
-        await livekit_api.aclose()
+        _egress_fail_count = 0
         return egress_info.egress_id
 
     except Exception as e:
-        logger.error(f"Failed to start recording: {e}")
+        logger.error("Failed to start recording: %s", e)
+        _record_egress_failure()
         return None
 
 
 async def stop_recording(egress_id: str) -> tuple[str | None, int | None]:
     """Stop recording and get the recording URL."""
     try:
-        livekit_api = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET"),
-        )
-
         # Stop the egress
+        livekit_api = await get_livekit_api()
         egress_info = await livekit_api.egress.stop_egress(api.StopEgressRequest(egress_id=egress_id))
 
         # Get the recording URL from file results
-        recording_url = None
-        if egress_info.file_results:
-            for file_result in egress_info.file_results:
-                if file_result.location:
-                    recording_url = file_result.location
-                    break
+        recording_url = next(
+            (f.location for f in egress_info.file_results if f.location), None
+        )
 
         # Calculate duration
         duration = None
         if egress_info.ended_at and egress_info.started_at:
-            duration = int((egress_info.ended_at - egress_info.started_at) / 1_000_000_000)  # nanoseconds to seconds
+            duration = (egress_info.ended_at - egress_info.started_at) // 1_000_000_000  # nanoseconds to seconds
 
-        logger.info(f"Recording stopped: {recording_url}, duration: {duration}s")
+        logger.info("Recording stopped: %s, duration: %ss", recording_url, duration)
 
-        await livekit_api.aclose()
         return recording_url, duration
 
     except Exception as e:
-        logger.error(f"Failed to stop recording: {e}")
+        logger.error("Failed to stop recording: %s", e)
         return None, None
 
 
-def get_caller_phone(ctx: JobContext) -> str | None:
-    """Extract caller phone number from SIP participant."""
+@lru_cache(maxsize=256)
+def _parse_metadata(raw: str | None) -> dict:
+    """Parse a LiveKit metadata blob, returning {} for empty/invalid payloads.
+
+    The leading-brace check skips the try/except machinery entirely for the
+    common case of empty or non-JSON metadata. Results are memoized on the
+    raw string since SIP metadata repeats across lookups within a call;
+    callers must treat the returned dict as read-only.
+    """
+    if not raw or raw[0] != '{':
+        return {}
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return {}
+
+
+def find_sip_participant(ctx: JobContext) -> rtc.RemoteParticipant | None:
+    """Find the SIP participant in the room (there is at most one per call).
+
+    Callers should look this up once and pass it to get_caller_phone /
+    get_called_number rather than re-scanning the participant list.
+    """
     for participant in ctx.room.remote_participants.values():
-        if participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP:
-            # SIP identity is usually the phone number
-            identity = participant.identity
-            # Clean up the phone number (remove sip: prefix if present)
-            if identity.startswith("sip:"):
-                identity = identity[4:]
-            if "@" in identity:
-                identity = identity.split("@")[0]
-            return identity
+        if participant.kind == _SIP_KIND:
+            return participant
     return None
 
 
-def get_called_number(ctx: JobContext) -> str | None:
+def get_caller_phone(participant: rtc.RemoteParticipant | None) -> str | None:
+    """Extract caller phone number from the SIP participant."""
+    if participant is None:
+        return None
+    # SIP identity is usually the phone number; strip the sip: prefix and
+    # any @host suffix in one regex pass
+    return _SIP_IDENT_RE.match(participant.identity).group(1)
+
+
+def get_called_number(ctx: JobContext, participant: rtc.RemoteParticipant | None) -> str | None:
     """Extract the called number (DID) from SIP participant metadata.
 
     This is the number the caller dialed - used for multi-tenant routing.
     """
-    for participant in ctx.room.remote_participants.values():
-        if participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_SIP:
-            # Try to get from metadata first
-            if participant.metadata:
-                import json
-                try:
-                    metadata = json.loads(participant.metadata)
-                    # LiveKit SIP typically includes called number in metadata
-                    if 'sip.calledNumber' in metadata:
-                        return metadata['sip.calledNumber']
-                    if 'calledNumber' in metadata:
-                        return metadata['calledNumber']
-                except json.JSONDecodeError:
-                    pass
-
-            # Try to get from name (some setups put DID there)
-            if participant.name and participant.name.startswith('+'):
-                return participant.name
-
-    # Check room metadata as fallback
-    if ctx.room.metadata:
-        import json
-        try:
-            room_meta = json.loads(ctx.room.metadata)
-            if 'sip.calledNumber' in room_meta:
-                return room_meta['sip.calledNumber']
-        except json.JSONDecodeError:
-            pass
+    if participant is not None:
+        # Substring gate before JSON parse: a raw `in` scan is far cheaper
+        # than json.loads when the key can't possibly be present
+        raw = participant.metadata
+        if raw and 'calledNumber' in raw:
+            metadata = _parse_metadata(raw)
+            # LiveKit SIP typically includes called number in metadata
+            if 'sip.calledNumber' in metadata:
+                return metadata['sip.calledNumber']
+            if 'calledNumber' in metadata:
+                return metadata['calledNumber']
+
+        # Try to get from name (some setups put DID there)
+        if participant.name and participant.name.startswith('+'):
+            return participant.name
+
+    # Check room metadata as fallback, behind the same gate
+    room_raw = ctx.room.metadata
+    if room_raw and 'calledNumber' in room_raw:
+        room_meta = _parse_metadata(room_raw)
+        if 'sip.calledNumber' in room_meta:
+            return room_meta['sip.calledNumber']
 
     return None
 
@@ -491,22 +656,30 @@ async def entrypoint(ctx: JobContext):
     - If main line: uses global AxlonAI settings, searches all inventory
     """
 
-    logger.info(f"Agent starting in room: {ctx.room.name}")
-    call_start_time = time.time()
+    logger.info("Agent starting in room: %s", ctx.room.name)
+    call_start_time = time.monotonic()
     egress_id = None
     call_log_id = None
-    call_log_tools = CallLogTools()
+
+    # Kick off the global settings fetch (sync Supabase call) in a thread so
+    # it overlaps with the WebRTC signaling handshake instead of adding a DB
+    # round-trip to call setup. Dealer calls don't await it, but the fetch
+    # still warms the settings cache.
+    settings_task = asyncio.create_task(run_db(get_ai_agent_settings))
 
     # Connect to the room first to access participant info
     await ctx.connect()
 
+    # Locate the SIP participant once, then extract caller/called numbers
+    sip_participant = find_sip_participant(ctx)
+
     # Get caller phone from SIP participant
-    caller_phone = get_caller_phone(ctx)
-    logger.info(f"Caller phone: {caller_phone}")
+    caller_phone = get_caller_phone(sip_participant)
+    logger.info("Caller phone: %s", caller_phone)
 
     # Get the called number (DID) to determine which agent to use
-    called_number = get_called_number(ctx)
-    logger.info(f"Called number (DID): {called_number}")
+    called_number = get_called_number(ctx, sip_participant)
+    logger.info("Called number (DID): %s", called_number)
 
     # Check if this is a dealer's dedicated line
     dealer_agent = None
@@ -515,7 +688,15 @@ async def entrypoint(ctx: JobContext):
     business_name = None
 
     if called_number:
-        dealer_agent = get_dealer_voice_agent_by_phone(called_number)
+        # Skip the DB lookup outright for DIDs that can't be a dealer line
+        # (dealer numbers are stored in E.164 format)
+        is_routable, _ = validate_e164_phone(called_number)
+        if not is_routable:
+            logger.info("Called number %s is not a routable DID - skipping dealer lookup", called_number)
+        else:
+            # Sync Supabase lookup - run it in a thread so other in-flight
+            # calls on this event loop aren't stalled behind the query
+            dealer_agent = await run_db(get_dealer_voice_agent_by_phone, called_number)
 
     # Transfer settings (will be set for dealer calls)
     can_transfer = False
@@ -528,13 +709,13 @@ async def entrypoint(ctx: JobContext):
         dealer_voice_agent_id = dealer_agent.get('id')
         business_name = dealer_agent.get('business_name') or dealer_agent.get('dealer', {}).get('company_name')
 
-        logger.info(f"Dealer call detected: {business_name} (dealer_id: {dealer_id})")
+        logger.info("Dealer call detected: %s (dealer_id: %s)", business_name, dealer_id)
 
         # Check business hours
         business_hours = dealer_agent.get('business_hours')
         if business_hours:
             is_after_hours = not is_within_business_hours(business_hours)
-            logger.info(f"Business hours check: {'CLOSED' if is_after_hours else 'OPEN'}")
+            logger.info("Business hours check: %s", 'CLOSED' if is_after_hours else 'OPEN')
 
         # Get transfer settings
         can_transfer = dealer_agent.get('can_transfer_calls', False)
@@ -548,15 +729,7 @@ async def entrypoint(ctx: JobContext):
             settings = {
                 'voice': dealer_agent.get('voice', 'Sal'),
                 'greeting_message': after_hours_msg,
-                'instructions': f"""You are {dealer_agent.get('agent_name', 'an AI assistant')} for {business_name}.
-
-The business is currently CLOSED. Your role is to:
-1. Let the caller know we are closed
-2. Capture their name, phone number, and what they're interested in
-3. Assure them someone will call them back during business hours
-
-Keep the conversation brief and focused on capturing their information for a callback.
-Do not search inventory or provide detailed information - just capture the lead.""",
+                'instructions': build_after_hours_instructions(dealer_agent, business_name),
                 'is_active': dealer_agent.get('is_active', True),
             }
         else:
@@ -569,48 +742,45 @@ Do not search inventory or provide detailed information - just capture the lead.
     else:
         # This is the main AxlonAI line - use global settings
         logger.info("Main line call - using global AxlonAI settings")
-        settings = get_ai_agent_settings()
+        settings = await settings_task
 
-    logger.info(f"Using voice: {settings.get('voice')}")
+    logger.info("Using voice: %s", settings.get('voice'))
 
-    # Check if agent is active
+    # Check if agent is active - bail before spending anything on recording
+    # or call logging for a disabled line
     if not settings.get('is_active', True):
         logger.warning("AI agent is disabled in settings")
         return
 
+    # Kick off recording setup in the background so the egress round-trip
+    # overlaps with the call-log insert and session setup below
+    recording_task = None
+    if RECORDING_ENABLED:
+        recording_task = asyncio.create_task(start_recording(ctx))
+    else:
+        logger.info("Recording disabled - Supabase not configured")
+
     # Create call log entry with dealer info if applicable
     if caller_phone:
-        call_log_id = await call_log_tools.create_call_log(
+        call_log_id = await _call_log_tools.create_call_log(
             caller_phone=caller_phone,
             call_sid=ctx.room.name,
             dealer_id=dealer_id,
             dealer_voice_agent_id=dealer_voice_agent_id,
         )
 
-    # Initialize call tracking
-    active_calls[ctx.room.name] = {
-        'start_time': call_start_time,
-        'lead_id': None,
-        'egress_id': None,
-        'call_log_id': call_log_id,
-        'caller_phone': caller_phone,
-        'dealer_id': dealer_id,
-        'dealer_voice_agent_id': dealer_voice_agent_id,
-    }
-
-    # Start recording if Supabase is configured
-    if os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY"):
-        egress_id = await start_recording(ctx)
-        if egress_id:
-            active_calls[ctx.room.name]['egress_id'] = egress_id
-    else:
-        logger.info("Recording disabled - Supabase not configured")
+    # Create xAI Realtime model with voice from settings, reusing the
+    # prewarmed instance when the voice matches
+    voice = settings.get('voice', 'Sal')
+    model = _models_by_voice.get(voice)
+    if model is None:
+        from livekit.plugins import xai
 
-    # Create xAI Realtime model with voice from settings
-    model = xai.realtime.RealtimeModel(
-        voice=settings.get('voice', 'Sal'),
-        api_key=os.getenv("XAI_API_KEY"),
-    )
+        model = xai.realtime.RealtimeModel(
+            voice=voice,
+            api_key=XAI_API_KEY,
+        )
+        _models_by_voice[voice] = model
 
     # Create agent with dealer context if applicable
     agent = AxlonAgent(
@@ -626,15 +796,25 @@ Do not search inventory or provide detailed information - just capture the lead.
     # Create session with xAI model
     session = AgentSession(llm=model)
 
-    # Start the session
-    await session.start(room=ctx.room, agent=agent)
+    # Start the session handshake and collect the egress start concurrently;
+    # the greeting only needs the session, not the recording
+    start_task = asyncio.create_task(session.start(room=ctx.room, agent=agent))
+
+    if recording_task is not None:
+        egress_id = await recording_task
+
+    # Attach per-call tracking state to the agent
+    agent.egress_id = egress_id
+    agent.call_log_id = call_log_id
+
+    await start_task
 
     # Generate greeting for inbound callers
     greeting = settings.get('greeting_message', 'Hello! How can I help you today?')
     await session.generate_reply(instructions=greeting)
 
-    logger.info(f"xAI voice agent session started successfully" +
-               (f" for {business_name}" if business_name else ""))
+    logger.info("xAI voice agent session started successfully%s",
+                f" for {business_name}" if business_name else "")
 
     # Wait for the session to end
     try:
@@ -642,83 +822,153 @@ Do not search inventory or provide detailed information - just capture the lead.
     except asyncio.CancelledError:
         pass
     finally:
-        # Calculate call duration
-        call_duration = int(time.time() - call_start_time)
-        call_minutes = max(1, (call_duration + 59) // 60)  # Round up to nearest minute
-        logger.info(f"Call ended. Duration: {call_duration}s ({call_minutes} min)")
+        # Calculate call duration (monotonic clock - immune to NTP steps,
+        # which matters because this feeds billing)
+        call_duration = int(time.monotonic() - call_start_time)
 
         # Stop recording and get URL
         recording_url = None
-        call_info = active_calls.get(ctx.room.name, {})
-        egress_id = call_info.get('egress_id')
-        lead_id = call_info.get('lead_id') or agent.captured_lead_id
-        call_log_id = call_info.get('call_log_id')
-        dealer_voice_agent_id = call_info.get('dealer_voice_agent_id')
+        egress_id = agent.egress_id
+        lead_id = agent.captured_lead_id
+        call_log_id = agent.call_log_id
 
         if egress_id:
-            recording_url, recorded_duration = await stop_recording(egress_id)
-            if recorded_duration:
-                call_duration = recorded_duration
-                call_minutes = max(1, (call_duration + 59) // 60)
+            # Shield so a second cancellation during teardown can't abort the
+            # egress-stop RPC mid-flight, and bound the wait so a slow LiveKit
+            # response can't pin the worker. Spawn via _spawn_background so
+            # the task stays strongly referenced past the timeout: the RPC
+            # keeps running and we finalize without the URL
+            try:
+                stop_task = _spawn_background(stop_recording(egress_id))
+                recording_url, recorded_duration = await asyncio.wait_for(
+                    asyncio.shield(stop_task), timeout=10.0
+                )
+                if recorded_duration:
+                    call_duration = recorded_duration
+            except asyncio.TimeoutError:
+                logger.warning("stop_recording timed out for egress %s - finalizing without recording URL", egress_id)
+
+        # Round up to nearest minute, computed once after the recorded
+        # duration (when available) has replaced the wall measurement
+        call_minutes = max(1, (call_duration + 59) // 60)
+        logger.info("Call ended. Duration: %ss (%s min)", call_duration, call_minutes)
+
+        # The remaining cleanup writes hit Supabase independently, so run
+        # them concurrently: teardown latency is the slowest round-trip
+        # instead of the sum of all three
+        cleanup_tasks = []
+        cleanup_names = []
 
         # Update dealer minutes used (for billing)
         if dealer_voice_agent_id:
-            await increment_dealer_minutes(dealer_voice_agent_id, call_minutes)
+            cleanup_tasks.append(increment_dealer_minutes(dealer_voice_agent_id, call_minutes))
+            cleanup_names.append("increment_dealer_minutes")
 
-        # Update lead with recording info
-        if lead_id and (recording_url or call_duration):
-            await update_lead_with_recording(
-                lead_id=lead_id,
-                recording_url=recording_url,
-                duration_seconds=call_duration,
-                call_sid=ctx.room.name,
-            )
-            logger.info(f"Updated lead {lead_id} with recording info")
-
-        # Update call log with all info
+        # Finalize call log + lead in one RPC round-trip when we have a call
+        # log; fall back to the lone lead update otherwise
         if call_log_id:
-            await call_log_tools.update_call_log(
+            cleanup_tasks.append(finalize_call(
                 call_log_id=call_log_id,
+                lead_id=lead_id,
                 caller_name=agent.caller_name,
                 duration_seconds=call_duration,
                 recording_url=recording_url,
                 interest=agent.interest,
                 equipment_type=agent.equipment_type,
                 intent=agent.intent,
-                lead_id=lead_id,
+                call_sid=ctx.room.name,
                 status="completed",
-            )
-            logger.info(f"Updated call log {call_log_id}")
+            ))
+            cleanup_names.append("finalize_call")
+        elif lead_id and (recording_url or call_duration):
+            cleanup_tasks.append(update_lead_with_recording(
+                lead_id=lead_id,
+                recording_url=recording_url,
+                duration_seconds=call_duration,
+                call_sid=ctx.room.name,
+            ))
+            cleanup_names.append("update_lead_with_recording")
+
+        if cleanup_tasks:
+            results = await asyncio.gather(*cleanup_tasks, return_exceptions=True)
+            for name, outcome in zip(cleanup_names, results):
+                if isinstance(outcome, Exception):
+                    logger.error("Call-end %s failed: %s", name, outcome)
+            logger.info("Call-end cleanup finished for %s", ctx.room.name)
 
+        if call_log_id:
             # Transcribe recording in background (don't block cleanup)
             if recording_url and call_duration and call_duration > 5:
                 # Only transcribe calls longer than 5 seconds
-                asyncio.create_task(
+                _spawn_background(
                     transcribe_and_summarize(call_log_id, recording_url)
                 )
 
-        # Cleanup
-        if ctx.room.name in active_calls:
-            del active_calls[ctx.room.name]
+
+def prewarm(proc: JobProcess):
+    """Warm per-process state before the first job is assigned.
+
+    This agent uses xAI's server-side speech-to-speech, so there is no local
+    VAD/STT model to load. Instead, pre-fetch the global AI settings so the
+    Supabase client and settings cache are warm before the first call lands.
+    """
+    # Deferring this import keeps the plugin's dependency graph out of the
+    # dispatcher process; job processes pay it once here, before any call
+    from livekit.plugins import xai
+
+    try:
+        settings = get_ai_agent_settings()
+        proc.userdata["settings"] = settings
+
+        # Construct the xAI realtime model ahead of the first job. The plugin
+        # opens its websocket inside session.start(), so the connection itself
+        # can't be pre-opened, but building the model here keeps its setup off
+        # the call path whenever the call uses the expected voice.
+        voice = settings.get('voice', 'Sal')
+        _models_by_voice[voice] = xai.realtime.RealtimeModel(
+            voice=voice,
+            api_key=XAI_API_KEY,
+        )
+    except Exception as e:
+        logger.warning("Prewarm failed: %s", e)
+
+
+# Bound concurrent transcription jobs so a burst of simultaneous call-ends
+# can't starve live voice sessions on this worker or blow xAI rate limits
+_transcribe_semaphore = asyncio.Semaphore(int(os.getenv("TRANSCRIBE_CONCURRENCY", "4")))
 
 
 async def transcribe_and_summarize(call_log_id: str, recording_url: str):
     """Background task to transcribe and summarize a call."""
-    try:
-        logger.info(f"Starting transcription for call {call_log_id}")
-        transcript = await transcribe_call_recording(call_log_id, recording_url)
+    async with _transcribe_semaphore:
+        try:
+            logger.info("Starting transcription for call %s", call_log_id)
+            transcript = await transcribe_call_recording(call_log_id, recording_url)
 
-        if transcript:
-            logger.info(f"Generating summary for call {call_log_id}")
-            await summarize_call(call_log_id, transcript)
-    except Exception as e:
-        logger.error(f"Error in transcription task: {e}")
+            if transcript:
+                logger.info("Generating summary for call %s", call_log_id)
+                await summarize_call(call_log_id, transcript)
+        except Exception as e:
+            logger.error("Error in transcription task: %s", e)
 
 
 if __name__ == "__main__":
+    # Surface missing transfer config at boot rather than per-call
+    if not LIVEKIT_SIP_TRUNK_ID:
+        logger.error("LIVEKIT_SIP_TRUNK_ID not configured - call transfers will be unavailable")
+
+    # Use uvloop when available (Linux/macOS) to reduce event-loop overhead
+    # across the many awaits per call; falls back to asyncio's default loop
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
             agent_name="axlon-voice-agent",
         )
     )
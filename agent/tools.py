@@ -6,8 +6,12 @@ Provides inventory search, lead capture, and settings functionality via Supabase
 
 import os
 import re
+import time
+import asyncio
 import hashlib
 import logging
+import threading
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, Tuple
 from supabase import create_client, Client
@@ -129,7 +133,7 @@ def is_within_business_hours(business_hours: Dict[str, Any]) -> bool:
         return open_minutes <= current_minutes < close_minutes
 
     except Exception as e:
-        logger.error(f"Error checking business hours: {e}")
+        logger.error("Error checking business hours: %s", e)
         # Fail open - don't reject calls due to config errors
         return True
 
@@ -167,12 +171,39 @@ Common equipment types:
 }
 
 
+# Shared async HTTP client for direct API calls (transcription, summaries).
+# One client means TLS handshakes and connection pools are amortized across
+# calls instead of being re-paid per request.
+_http_client = None
+
+
+def get_http_client():
+    """Get the shared httpx.AsyncClient (created lazily on first use)."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(30.0),
+        )
+    return _http_client
+
+
+# Supabase client is safe to share across calls - cache it so each tool call
+# doesn't pay client construction + connection setup again
+_supabase_client: Optional[Client] = None
+
+
 def get_supabase() -> Client:
-    """Get Supabase client.
+    """Get Supabase client (cached after first call).
 
     Prefers SUPABASE_SERVICE_ROLE_KEY for full access (bypasses RLS).
     Falls back to SUPABASE_ANON_KEY if service role not available.
     """
+    global _supabase_client
+    if _supabase_client is not None:
+        return _supabase_client
+
     url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 
     # Prefer service role key for full database access
@@ -192,27 +223,162 @@ def get_supabase() -> Client:
     if not service_key:
         logger.warning("Using anon key instead of service role key - RLS restrictions will apply")
 
-    return create_client(url, key)
+    _supabase_client = create_client(url, key)
+    return _supabase_client
+
+
+# Bound concurrent sync-DB thread offloads: under a burst of calls an
+# uncapped to_thread fan-out can saturate the default executor and starve the
+# RTC loop's own thread work. Every offload path shares this one bound,
+# tunable via DB_THREAD_CONCURRENCY.
+_db_semaphore = asyncio.Semaphore(int(os.getenv("DB_THREAD_CONCURRENCY", "8")))
+
+
+async def run_db(fn, *args):
+    """Run a blocking DB helper in a thread, bounded by the shared semaphore."""
+    async with _db_semaphore:
+        return await asyncio.to_thread(fn, *args)
+
+
+async def _execute(query):
+    """Run a built supabase query's blocking .execute() in a worker thread.
+
+    supabase-py is synchronous, so calling .execute() directly inside a
+    coroutine stalls the event loop (and the audio path) for the whole HTTP
+    round-trip; the thread hop keeps the loop pumping.
+    """
+    return await run_db(query.execute)
+
+
+async def pg_insert(table: str, row: Dict[str, Any]) -> None:
+    """Insert a row via PostgREST directly on the shared async HTTP client.
+
+    The supabase-py client is synchronous and blocks the event loop, so
+    fire-and-forget writes (audit logs and the like) go through this helper
+    instead of paying an asyncio.to_thread hop per row. Raises on non-2xx so
+    callers can decide whether the write is best-effort.
+    """
+    url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    if not url or not key:
+        raise ValueError("Missing Supabase credentials")
+
+    client = get_http_client()
+    response = await client.post(
+        f"{url}/rest/v1/{table}",
+        json=row,
+        headers={
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Prefer": "return=minimal",
+        },
+        timeout=5.0,
+    )
+    response.raise_for_status()
+
+
+# In-process cache for AI agent settings. Settings change rarely (admin panel
+# writes), so a short TTL keeps the per-call DB round-trip off the call-setup
+# path while bounding how long stale settings can live.
+SETTINGS_CACHE_TTL_SECONDS = 30.0
+_settings_cache: Tuple[Optional[Dict[str, Any]], float] = (None, 0.0)
+# Single-flight guard: when the TTL lapses under a burst of concurrent calls,
+# only one DB-offload thread refreshes while the rest wait and reuse its result
+_settings_refresh_lock = threading.Lock()
+
+
+def invalidate_settings_cache() -> None:
+    """Force the next get_ai_agent_settings() call to hit the database.
+
+    Call this when the admin panel writes new settings (e.g. from a
+    webhook or realtime subscription) so updates apply before the TTL expires.
+    """
+    global _settings_cache
+    _settings_cache = (None, 0.0)
 
 
 def get_ai_agent_settings() -> Dict[str, Any]:
-    """Fetch AI agent settings from database."""
+    """Fetch AI agent settings, using a short-lived in-process cache."""
+    global _settings_cache
+
+    cached_value, fetched_at = _settings_cache
+    if cached_value is not None and time.monotonic() - fetched_at < SETTINGS_CACHE_TTL_SECONDS:
+        return cached_value
+
+    with _settings_refresh_lock:
+        # Another thread may have refreshed while we waited on the lock
+        cached_value, fetched_at = _settings_cache
+        if cached_value is not None and time.monotonic() - fetched_at < SETTINGS_CACHE_TTL_SECONDS:
+            return cached_value
+        return _fetch_ai_agent_settings(cached_value)
+
+
+def _fetch_ai_agent_settings(cached_value: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Uncached settings fetch; serves stale/default settings on failure."""
+    global _settings_cache
     try:
         supabase = get_supabase()
         result = supabase.table("ai_agent_settings").select("*").single().execute()
 
         if result.data:
             logger.info("Loaded AI agent settings from database")
+            _settings_cache = (result.data, time.monotonic())
             return result.data
         else:
             logger.warning("No AI agent settings found, using defaults")
             return DEFAULT_SETTINGS
 
     except Exception as e:
-        logger.error(f"Error fetching AI agent settings: {e}")
+        logger.error("Error fetching AI agent settings: %s", e)
+        # Serve stale settings over defaults if we have them
+        if cached_value is not None:
+            return cached_value
         return DEFAULT_SETTINGS
 
 
+class _TTLCache:
+    """Minimal TTL + size-bounded cache for formatted tool results.
+
+    Inventory is mostly static on the timescale of a phone call, and callers
+    frequently repeat the same search while asking follow-ups; serving the
+    pre-formatted string from memory skips the Supabase round-trip.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: Dict[Any, Tuple[Any, float]] = {}
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if len(self._entries) >= self.maxsize:
+            # Drop the oldest entry (insertion order ~= age for our usage)
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (value, time.monotonic())
+
+
+# DID -> dealer agent config cache. Repeat calls to the same dealer line (and
+# to the main line, which caches the "no dealer" result) skip the lookup
+# queries entirely. Entries are wrapped in a tuple so a cached None is
+# distinguishable from a cache miss. Only successful lookups are cached:
+# a transient DB error must not answer a dealer's line as the generic
+# main-line agent for the next 60 seconds.
+_dealer_agent_cache = _TTLCache(maxsize=256, ttl=60.0)
+
+# Sentinel the fetch returns when the lookup itself failed, as opposed to
+# succeeding with no dealer configured for the number
+_DEALER_LOOKUP_FAILED = object()
+
+
 def get_dealer_voice_agent_by_phone(phone_number: str) -> Optional[Dict[str, Any]]:
     """Fetch dealer voice agent settings by their dedicated phone number (DID).
 
@@ -222,6 +388,24 @@ def get_dealer_voice_agent_by_phone(phone_number: str) -> Optional[Dict[str, Any
     Returns:
         Dealer voice agent settings dict or None if not found
     """
+    cached = _dealer_agent_cache.get(phone_number)
+    if cached is not None:
+        return cached[0]
+
+    result = _fetch_dealer_voice_agent_by_phone(phone_number)
+    if result is _DEALER_LOOKUP_FAILED:
+        # Leave the cache alone so the next call retries the lookup
+        return None
+    _dealer_agent_cache.set(phone_number, (result,))
+    return result
+
+
+def _fetch_dealer_voice_agent_by_phone(phone_number: str):
+    """Uncached dealer voice agent lookup.
+
+    Returns the settings dict, None when no dealer is configured for the
+    number, or _DEALER_LOOKUP_FAILED when the lookup errored.
+    """
     try:
         supabase = get_supabase()
 
@@ -243,7 +427,7 @@ def get_dealer_voice_agent_by_phone(phone_number: str) -> Optional[Dict[str, Any
         ).eq("phone_number", clean_number).eq("is_active", True).single().execute()
 
         if result.data:
-            logger.info(f"Found dealer voice agent for {clean_number}: {result.data.get('business_name')}")
+            logger.info("Found dealer voice agent for %s: %s", clean_number, result.data.get('business_name'))
             return result.data
 
         # Try alternate format (+1 vs 1 prefix)
@@ -265,24 +449,37 @@ def get_dealer_voice_agent_by_phone(phone_number: str) -> Optional[Dict[str, Any
             ).eq("phone_number", alt_number).eq("is_active", True).single().execute()
 
             if result.data:
-                logger.info(f"Found dealer voice agent for {alt_number}: {result.data.get('business_name')}")
+                logger.info("Found dealer voice agent for %s: %s", alt_number, result.data.get('business_name'))
                 return result.data
 
-        logger.info(f"No dealer voice agent found for {phone_number}")
+        logger.info("No dealer voice agent found for %s", phone_number)
         return None
 
     except Exception as e:
-        logger.error(f"Error fetching dealer voice agent: {e}")
-        return None
+        logger.error("Error fetching dealer voice agent: %s", e)
+        return _DEALER_LOOKUP_FAILED
 
 
 def build_dealer_instructions(dealer_agent: Dict[str, Any]) -> str:
-    """Build custom instructions for a dealer's voice agent."""
+    """Build custom instructions for a dealer's voice agent.
+
+    The multi-KB prompt is a pure function of four config fields, so the
+    assembled string is memoized on them - repeat calls to the same DID
+    (the common case) reuse the cached build instead of re-rendering it.
+    """
     business_name = dealer_agent.get('business_name') or dealer_agent.get('dealer', {}).get('company_name') or 'the dealership'
-    business_desc = dealer_agent.get('business_description') or ''
-    custom_instructions = dealer_agent.get('instructions') or ''
+    return _build_dealer_instructions_cached(
+        dealer_agent.get('agent_name') or 'an AI assistant',
+        business_name,
+        dealer_agent.get('business_description') or '',
+        dealer_agent.get('instructions') or '',
+    )
+
 
-    base_instructions = f"""You are {dealer_agent.get('agent_name', 'an AI assistant')} for {business_name}.
+@lru_cache(maxsize=512)
+def _build_dealer_instructions_cached(agent_name: str, business_name: str,
+                                      business_desc: str, custom_instructions: str) -> str:
+    base_instructions = f"""You are {agent_name} for {business_name}.
 
 {f"About the business: {business_desc}" if business_desc else ""}
 
@@ -320,34 +517,124 @@ Example staff interactions:
     return base_instructions
 
 
+def build_after_hours_instructions(dealer_agent: Dict[str, Any], business_name: str) -> str:
+    """Build simplified after-hours instructions for a dealer's voice agent."""
+    return f"""You are {dealer_agent.get('agent_name', 'an AI assistant')} for {business_name}.
+
+The business is currently CLOSED. Your role is to:
+1. Let the caller know we are closed
+2. Capture their name, phone number, and what they're interested in
+3. Assure them someone will call them back during business hours
+
+Keep the conversation brief and focused on capturing their information for a callback.
+Do not search inventory or provide detailed information - just capture the lead."""
+
+
 async def increment_dealer_minutes(dealer_agent_id: str, minutes: int) -> bool:
-    """Increment minutes used for a dealer voice agent."""
+    """Increment minutes used for a dealer voice agent.
+
+    Uses the increment_dealer_agent_minutes Postgres function so the add
+    happens atomically in one round-trip; falls back to the read-then-write
+    path if the RPC is unavailable (migration not applied yet).
+    """
     try:
         supabase = get_supabase()
 
+        try:
+            await _execute(supabase.rpc("increment_dealer_agent_minutes", {
+                "p_agent_id": dealer_agent_id,
+                "p_minutes": minutes,
+            }))
+            logger.info("Incremented dealer %s minutes by %s", dealer_agent_id, minutes)
+            return True
+        except Exception as rpc_error:
+            logger.warning("increment RPC failed (%s) - falling back to read-then-write", rpc_error)
+
         # Get current usage
-        result = supabase.table("dealer_voice_agents").select(
+        result = await _execute(supabase.table("dealer_voice_agents").select(
             "minutes_used, minutes_included"
-        ).eq("id", dealer_agent_id).single().execute()
+        ).eq("id", dealer_agent_id).single())
 
         if result.data:
             new_minutes = (result.data.get('minutes_used') or 0) + minutes
 
             # Update minutes used
-            supabase.table("dealer_voice_agents").update({
+            await _execute(supabase.table("dealer_voice_agents").update({
                 "minutes_used": new_minutes
-            }).eq("id", dealer_agent_id).execute()
+            }).eq("id", dealer_agent_id))
 
-            logger.info(f"Updated dealer {dealer_agent_id} minutes: {new_minutes}/{result.data.get('minutes_included')}")
+            logger.info("Updated dealer %s minutes: %s/%s", dealer_agent_id, new_minutes, result.data.get('minutes_included'))
             return True
 
         return False
 
     except Exception as e:
-        logger.error(f"Error updating dealer minutes: {e}")
+        logger.error("Error updating dealer minutes: %s", e)
         return False
 
 
+# Category slugs change essentially never; cache slug -> category_id lookups
+# so each inventory search doesn't pay an extra DB query to resolve them
+CATEGORY_CACHE_TTL_SECONDS = 300.0
+_category_cache: Dict[str, Tuple[list, float]] = {}
+
+
+def _resolve_category_ids(supabase: Client, category: str) -> list:
+    """Resolve a category slug (or partial slug) to category IDs, cached."""
+    cached = _category_cache.get(category)
+    if cached is not None:
+        ids, fetched_at = cached
+        if time.monotonic() - fetched_at < CATEGORY_CACHE_TTL_SECONDS:
+            return ids
+
+    ids = []
+    cat_result = supabase.table("categories").select("id").eq("slug", category).single().execute()
+    if cat_result.data:
+        ids = [cat_result.data['id']]
+    else:
+        # Try partial match on category name
+        cat_result = supabase.table("categories").select("id").ilike("slug", f"%{category}%").execute()
+        if cat_result.data:
+            ids = [c['id'] for c in cat_result.data]
+
+    _category_cache[category] = (ids, time.monotonic())
+    return ids
+
+
+_search_result_cache = _TTLCache(maxsize=1024, ttl=30.0)
+_listing_details_cache = _TTLCache(maxsize=512, ttl=60.0)
+
+# Dealer phone by listing, filled opportunistically by get_details (whose
+# query already joins the dealer profile) so a follow-up get_dealer_phone for
+# the same listing is answered without another round-trip
+_dealer_phone_cache = _TTLCache(maxsize=512, ttl=120.0)
+
+
+# Canonical condition values stored on listings. The LLM occasionally passes
+# synonyms; normalize once at the tool boundary so queries (and cache keys)
+# always use the same strings.
+_CONDITION_MAP = {
+    "new": "new",
+    "brand new": "new",
+    "used": "used",
+    "pre-owned": "used",
+    "preowned": "used",
+    "second hand": "used",
+}
+
+
+def _normalize_search_filters(
+    category: Optional[str],
+    condition: Optional[str],
+) -> Tuple[Optional[str], Optional[str]]:
+    """Normalize free-form category/condition strings to canonical values."""
+    if category:
+        category = category.strip().lower()
+    if condition:
+        condition = _CONDITION_MAP.get(condition.strip().lower(), condition.strip().lower())
+    return category, condition
+
+
 class InventoryTools:
     """Tools for searching and retrieving inventory from Supabase."""
 
@@ -370,6 +657,13 @@ class InventoryTools:
     ) -> str:
         """Search inventory based on filters."""
         try:
+            category, condition = _normalize_search_filters(category, condition)
+
+            cache_key = (self.dealer_id, category, make, min_price, max_price, condition, limit)
+            cached = _search_result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             supabase = get_supabase()
 
             # Build query with category join
@@ -383,16 +677,11 @@ class InventoryTools:
 
             # Apply filters
             if category:
-                # First look up category ID by slug
-                cat_result = supabase.table("categories").select("id").eq("slug", category).single().execute()
-                if cat_result.data:
-                    query = query.eq("category_id", cat_result.data['id'])
-                else:
-                    # Try partial match on category name
-                    cat_result = supabase.table("categories").select("id").ilike("slug", f"%{category}%").execute()
-                    if cat_result.data:
-                        cat_ids = [c['id'] for c in cat_result.data]
-                        query = query.in_("category_id", cat_ids)
+                cat_ids = await run_db(_resolve_category_ids, supabase, category)
+                if len(cat_ids) == 1:
+                    query = query.eq("category_id", cat_ids[0])
+                elif cat_ids:
+                    query = query.in_("category_id", cat_ids)
 
             if make:
                 query = query.ilike("make", f"%{make}%")
@@ -407,7 +696,7 @@ class InventoryTools:
                 query = query.eq("condition", condition)
 
             # Execute query
-            result = query.order("created_at", desc=True).limit(limit).execute()
+            result = await _execute(query.order("created_at", desc=True).limit(limit))
 
             if not result.data:
                 if self.dealer_id:
@@ -428,36 +717,45 @@ class InventoryTools:
 
                 response_parts.append(
                     f"{i}. {year} {make} {model}, {condition}, {price_str}"
-                    + (f", located in {location}" if location else "")
+                    f"{f', located in {location}' if location else ''}"
                 )
 
-            return " ".join(response_parts)
+            response = " ".join(response_parts)
+            _search_result_cache.set(cache_key, response)
+            return response
 
         except Exception as e:
-            logger.error(f"Error searching inventory: {e}", exc_info=True)
+            logger.error("Error searching inventory: %s", e, exc_info=True)
             # Log additional context for debugging
-            logger.error(f"Search params: dealer_id={self.dealer_id}, category={category}, make={make}")
+            logger.error("Search params: dealer_id=%s, category=%s, make=%s", self.dealer_id, category, make)
             return "I'm having trouble searching our inventory right now. Would you like me to take your information for a callback?"
 
     async def get_details(self, listing_id: str) -> str:
         """Get detailed information about a specific listing."""
         try:
+            cached = _listing_details_cache.get(listing_id)
+            if cached is not None:
+                return cached
+
             supabase = get_supabase()
 
-            result = supabase.table("listings").select(
+            query = supabase.table("listings").select(
                 """
                 id, title, description, price, year, make, model, condition,
                 mileage, hours, vin, stock_number, city, state,
                 specs, features,
                 profiles!user_id(company_name, phone, email)
                 """
-            ).eq("id", listing_id).single().execute()
+            ).eq("id", listing_id).single()
+            result = await _execute(query)
 
             if not result.data:
                 return "I couldn't find that listing. It may no longer be available."
 
             listing = result.data
             dealer = listing.get('profiles', {})
+            if dealer.get('phone'):
+                _dealer_phone_cache.set(listing_id, dealer['phone'])
 
             # Build detailed response
             parts = []
@@ -490,27 +788,36 @@ class InventoryTools:
                 if len(desc) < 200:
                     parts.append(desc + ".")
 
-            return " ".join(parts)
+            response = " ".join(parts)
+            _listing_details_cache.set(listing_id, response)
+            return response
 
         except Exception as e:
-            logger.error(f"Error getting listing details: {e}")
+            logger.error("Error getting listing details: %s", e)
             return "I'm having trouble getting the details right now. Would you like me to take your information for a callback?"
 
     async def get_dealer_phone(self, listing_id: str) -> Optional[str]:
         """Get the dealer's phone number for a listing."""
         try:
+            cached = _dealer_phone_cache.get(listing_id)
+            if cached is not None:
+                return cached
+
             supabase = get_supabase()
 
-            result = supabase.table("listings").select(
+            result = await _execute(supabase.table("listings").select(
                 "profiles!user_id(phone)"
-            ).eq("id", listing_id).single().execute()
+            ).eq("id", listing_id).single())
 
             if result.data and result.data.get('profiles'):
-                return result.data['profiles'].get('phone')
+                phone = result.data['profiles'].get('phone')
+                if phone:
+                    _dealer_phone_cache.set(listing_id, phone)
+                return phone
             return None
 
         except Exception as e:
-            logger.error(f"Error getting dealer phone: {e}")
+            logger.error("Error getting dealer phone: %s", e)
             return None
 
 
@@ -563,40 +870,62 @@ class LeadTools:
         try:
             supabase = get_supabase()
 
-            # Determine user_id (dealer to assign lead to)
-            user_id = self.dealer_id  # Start with pre-set dealer_id if any
+            lead_id = None
+            user_id = self.dealer_id  # Dealer to assign lead to, if pre-set
 
-            # If we have a listing_id and no dealer_id set, get from listing
+            # When the dealer comes from the listing, insert_lead_for_listing
+            # (migration 033) copies user_id from the listing row while
+            # inserting the lead - one round-trip instead of lookup + insert
             if listing_id and not user_id:
-                listing_result = supabase.table("listings").select(
-                    "user_id"
-                ).eq("id", listing_id).single().execute()
-
-                if listing_result.data:
-                    user_id = listing_result.data.get('user_id')
-
-            # Create the lead with correct field names
-            lead_data = {
-                "buyer_name": name,
-                "buyer_phone": phone,
-                "buyer_email": email or "",
-                "message": interest,
-                "status": "new",
-                "intent": intent,  # buy, lease, rent
-                "equipment_type": equipment_type,
-                "created_at": datetime.utcnow().isoformat(),
-            }
-
-            if listing_id:
-                lead_data["listing_id"] = listing_id
-            if user_id:
-                lead_data["user_id"] = user_id
-
-            result = supabase.table("leads").insert(lead_data).execute()
+                try:
+                    rpc_result = await _execute(supabase.rpc("insert_lead_for_listing", {
+                        "p_listing_id": listing_id,
+                        "p_buyer_name": name,
+                        "p_buyer_phone": phone,
+                        "p_buyer_email": email or "",
+                        "p_message": interest,
+                        "p_intent": intent,
+                        "p_equipment_type": equipment_type,
+                    }))
+                    lead_id = rpc_result.data
+                except Exception as rpc_error:
+                    logger.warning("insert_lead_for_listing RPC failed (%s) - falling back to lookup + insert", rpc_error)
+
+            if not lead_id:
+                # Fallback / non-listing path: resolve the dealer (if needed)
+                # then insert the lead directly
+                if listing_id and not user_id:
+                    listing_result = await _execute(supabase.table("listings").select(
+                        "user_id"
+                    ).eq("id", listing_id).single())
+
+                    if listing_result.data:
+                        user_id = listing_result.data.get('user_id')
+
+                # Create the lead with correct field names
+                lead_data = {
+                    "buyer_name": name,
+                    "buyer_phone": phone,
+                    "buyer_email": email or "",
+                    "message": interest,
+                    "status": "new",
+                    "intent": intent,  # buy, lease, rent
+                    "equipment_type": equipment_type,
+                    "created_at": datetime.utcnow().isoformat(),
+                }
+
+                if listing_id:
+                    lead_data["listing_id"] = listing_id
+                if user_id:
+                    lead_data["user_id"] = user_id
+
+                result = await _execute(supabase.table("leads").insert(lead_data))
+
+                if result.data:
+                    lead_id = result.data[0].get('id')
 
-            if result.data:
-                lead_id = result.data[0].get('id') if result.data else None
-                logger.info(f"Lead captured successfully: {name} - {phone} - intent: {intent} - dealer: {user_id} - id: {lead_id}")
+            if lead_id:
+                logger.info("Lead captured successfully: %s - %s - intent: %s - dealer: %s - id: %s", name, phone, intent, user_id, lead_id)
                 intent_str = f" to {intent}" if intent else ""
 
                 # Customize response if we have a business name
@@ -607,7 +936,7 @@ class LeadTools:
                 return "I've noted your information. A team member will follow up with you shortly.", None
 
         except Exception as e:
-            logger.error(f"Error capturing lead: {e}")
+            logger.error("Error capturing lead: %s", e)
             return "I've noted your information. Someone will be in touch with you soon.", None
 
     async def get_recent_leads(self, user_id: str, limit: int = 10) -> list:
@@ -615,16 +944,18 @@ class LeadTools:
         try:
             supabase = get_supabase()
 
-            result = supabase.table("leads").select(
-                "*"
+            # Project only list-view fields; message/recording/summary are
+            # large text columns nobody reads here
+            result = await _execute(supabase.table("leads").select(
+                "id, buyer_name, buyer_phone, buyer_email, intent, equipment_type, listing_id, status, created_at"
             ).eq("user_id", user_id).order(
                 "created_at", desc=True
-            ).limit(limit).execute()
+            ).limit(limit))
 
             return result.data or []
 
         except Exception as e:
-            logger.error(f"Error getting leads: {e}")
+            logger.error("Error getting leads: %s", e)
             return []
 
 
@@ -649,18 +980,73 @@ async def update_lead_with_recording(
         if not update_data:
             return False
 
-        result = supabase.table("leads").update(update_data).eq("id", lead_id).execute()
+        result = await _execute(supabase.table("leads").update(update_data).eq("id", lead_id))
 
         if result.data:
-            logger.info(f"Updated lead {lead_id} with recording: url={recording_url}, duration={duration_seconds}s")
+            logger.info("Updated lead %s with recording: url=%s, duration=%ss", lead_id, recording_url, duration_seconds)
             return True
         return False
 
     except Exception as e:
-        logger.error(f"Error updating lead with recording: {e}")
+        logger.error("Error updating lead with recording: %s", e)
         return False
 
 
+async def finalize_call(
+    call_log_id: str,
+    lead_id: Optional[str] = None,
+    caller_name: Optional[str] = None,
+    duration_seconds: Optional[int] = None,
+    recording_url: Optional[str] = None,
+    interest: Optional[str] = None,
+    equipment_type: Optional[str] = None,
+    intent: Optional[str] = None,
+    call_sid: Optional[str] = None,
+    status: str = "completed",
+) -> bool:
+    """Finalize call log and lead in one DB round-trip via the finalize_call
+    Postgres function. Falls back to the separate update helpers if the RPC
+    is unavailable (e.g. migration not applied yet)."""
+    try:
+        supabase = get_supabase()
+        await _execute(supabase.rpc("finalize_call", {
+            "p_call_log_id": call_log_id,
+            "p_lead_id": lead_id,
+            "p_caller_name": caller_name,
+            "p_duration_seconds": duration_seconds,
+            "p_recording_url": recording_url,
+            "p_interest": interest,
+            "p_equipment_type": equipment_type,
+            "p_intent": intent,
+            "p_call_sid": call_sid,
+            "p_status": status,
+        }))
+        logger.info("Finalized call log %s (lead: %s)", call_log_id, lead_id)
+        return True
+
+    except Exception as e:
+        logger.warning("finalize_call RPC failed (%s) - falling back to separate updates", e)
+        ok = await CallLogTools().update_call_log(
+            call_log_id=call_log_id,
+            caller_name=caller_name,
+            duration_seconds=duration_seconds,
+            recording_url=recording_url,
+            interest=interest,
+            equipment_type=equipment_type,
+            intent=intent,
+            lead_id=lead_id,
+            status=status,
+        )
+        if lead_id and (recording_url or duration_seconds):
+            await update_lead_with_recording(
+                lead_id=lead_id,
+                recording_url=recording_url,
+                duration_seconds=duration_seconds,
+                call_sid=call_sid,
+            )
+        return ok
+
+
 class StaffAuthTools:
     """Tools for staff authentication and internal data queries."""
 
@@ -693,12 +1079,12 @@ class StaffAuthTools:
             supabase = get_supabase()
 
             # First, find staff by name (case-insensitive exact match preferred)
-            result = supabase.table("dealer_staff").select("*").eq(
+            result = await _execute(supabase.table("dealer_staff").select("*").eq(
                 "dealer_id", self.dealer_id
-            ).eq("is_active", True).execute()
+            ).eq("is_active", True))
 
             if not result.data:
-                logger.warning(f"No active staff found for dealer {self.dealer_id}")
+                logger.warning("No active staff found for dealer %s", self.dealer_id)
                 return False, None, "No staff accounts found. Please contact your administrator."
 
             # Find matching staff by name (exact match first, then partial)
@@ -722,15 +1108,15 @@ class StaffAuthTools:
 
             if not staff:
                 # Log failed attempt - name not found
-                supabase.table("dealer_staff_access_logs").insert({
+                await _execute(supabase.table("dealer_staff_access_logs").insert({
                     "dealer_id": self.dealer_id,
                     "caller_phone": caller_phone,
                     "auth_success": False,
                     "auth_method": "name_lookup",
                     "query": f"Name not found: {name}",
-                }).execute()
+                }))
 
-                logger.warning(f"Staff auth failed - name not found for dealer {self.dealer_id}")
+                logger.warning("Staff auth failed - name not found for dealer %s", self.dealer_id)
                 return False, None, "I couldn't find a staff member with that name. Please try again."
 
             # Check if account is locked
@@ -756,10 +1142,10 @@ class StaffAuthTools:
                 if pin_valid:
                     # Migrate to hashed PIN on successful auth
                     new_hash = hash_pin(pin, salt=staff_id)
-                    supabase.table("dealer_staff").update({
+                    await _execute(supabase.table("dealer_staff").update({
                         "pin_hash": new_hash,
-                    }).eq("id", staff_id).execute()
-                    logger.info(f"Migrated staff {staff_id} to hashed PIN")
+                    }).eq("id", staff_id))
+                    logger.info("Migrated staff %s to hashed PIN", staff_id)
 
             if not pin_valid:
                 # Increment failed attempts
@@ -770,19 +1156,19 @@ class StaffAuthTools:
                 if failed_attempts >= MAX_PIN_ATTEMPTS:
                     lock_until = datetime.now(timezone.utc) + timedelta(minutes=PIN_LOCKOUT_MINUTES)
                     update_data["locked_until"] = lock_until.isoformat()
-                    logger.warning(f"Staff account {staff_id} locked after {failed_attempts} failed attempts")
+                    logger.warning("Staff account %s locked after %s failed attempts", staff_id, failed_attempts)
 
-                supabase.table("dealer_staff").update(update_data).eq("id", staff_id).execute()
+                await _execute(supabase.table("dealer_staff").update(update_data).eq("id", staff_id))
 
                 # Log failed attempt
-                supabase.table("dealer_staff_access_logs").insert({
+                await _execute(supabase.table("dealer_staff_access_logs").insert({
                     "dealer_id": self.dealer_id,
                     "staff_id": staff_id,
                     "caller_phone": caller_phone,
                     "auth_success": False,
                     "auth_method": "pin",
                     "query": f"Invalid PIN (attempt {failed_attempts}/{MAX_PIN_ATTEMPTS})",
-                }).execute()
+                }))
 
                 if failed_attempts >= MAX_PIN_ATTEMPTS:
                     return False, None, f"Too many failed attempts. Account locked for {PIN_LOCKOUT_MINUTES} minutes."
@@ -791,31 +1177,31 @@ class StaffAuthTools:
                 return False, None, f"Invalid PIN. {remaining} attempts remaining."
 
             # Success - reset failed attempts and update access tracking
-            supabase.table("dealer_staff").update({
+            await _execute(supabase.table("dealer_staff").update({
                 "last_access_at": datetime.utcnow().isoformat(),
                 "access_count": (staff.get('access_count') or 0) + 1,
                 "failed_attempts": 0,
                 "locked_until": None,
-            }).eq("id", staff_id).execute()
+            }).eq("id", staff_id))
 
             # Log successful access
-            supabase.table("dealer_staff_access_logs").insert({
+            await _execute(supabase.table("dealer_staff_access_logs").insert({
                 "dealer_id": self.dealer_id,
                 "staff_id": staff_id,
                 "caller_phone": caller_phone,
                 "auth_success": True,
                 "auth_method": "name_and_pin",
                 "query": "Successful authentication",
-            }).execute()
+            }))
 
             # Store authenticated staff
             self.authenticated_staff = staff
 
-            logger.info(f"Staff authenticated: {staff['name']} for dealer {self.dealer_id}")
+            logger.info("Staff authenticated: %s for dealer %s", staff['name'], self.dealer_id)
             return True, staff, f"Access granted. Welcome back, {staff['name']}!"
 
         except Exception as e:
-            logger.error(f"Error verifying staff PIN: {e}")
+            logger.error("Error verifying staff PIN: %s", e)
             return False, None, "I'm having trouble verifying your credentials. Please try again."
 
     async def query_internal_data(
@@ -855,7 +1241,7 @@ class StaffAuthTools:
                 return f"I don't recognize the query type '{query_type}'. Try inventory, leads, customer, pricing, or stats."
 
         except Exception as e:
-            logger.error(f"Error querying internal data: {e}")
+            logger.error("Error querying internal data: %s", e)
             return "I'm having trouble accessing that data right now. Please try again."
 
     async def _query_inventory(
@@ -879,7 +1265,7 @@ class StaffAuthTools:
             if filters.get('stock_number'):
                 db_query = db_query.eq('stock_number', filters['stock_number'])
 
-        result = db_query.execute()
+        result = await _execute(db_query)
 
         if not result.data:
             return "No listings found matching your criteria."
@@ -927,7 +1313,7 @@ class StaffAuthTools:
                 today = datetime.utcnow().strftime('%Y-%m-%d')
                 db_query = db_query.gte('created_at', today)
 
-        result = db_query.execute()
+        result = await _execute(db_query)
 
         if not result.data:
             return "No leads found."
@@ -953,11 +1339,11 @@ class StaffAuthTools:
         if not query:
             return "Please provide a customer name or phone number to look up."
 
-        result = supabase.table("leads").select(
+        result = await _execute(supabase.table("leads").select(
             "id, buyer_name, buyer_email, buyer_phone, message, status, created_at"
         ).eq("user_id", self.dealer_id).or_(
             f"buyer_name.ilike.%{query}%,buyer_phone.ilike.%{query}%,buyer_email.ilike.%{query}%"
-        ).order("created_at", desc=True).limit(5).execute()
+        ).order("created_at", desc=True).limit(5))
 
         if not result.data:
             return f"No customer found matching '{query}'."
@@ -983,11 +1369,11 @@ class StaffAuthTools:
         if not query:
             return "Please provide a stock number or listing ID."
 
-        result = supabase.table("listings").select(
+        result = await _execute(supabase.table("listings").select(
             "id, title, price, ai_price_estimate, acquisition_cost, stock_number"
         ).eq("user_id", self.dealer_id).or_(
             f"stock_number.eq.{query},id.eq.{query}"
-        ).single().execute()
+        ).single())
 
         if not result.data:
             return f"No listing found for '{query}'."
@@ -1022,27 +1408,27 @@ class StaffAuthTools:
     ) -> str:
         """Get dealer stats overview."""
         # Count listings
-        total_listings = supabase.table("listings").select(
+        total_listings = await _execute(supabase.table("listings").select(
             "*", count="exact", head=True
-        ).eq("user_id", self.dealer_id).execute()
+        ).eq("user_id", self.dealer_id))
 
-        active_listings = supabase.table("listings").select(
+        active_listings = await _execute(supabase.table("listings").select(
             "*", count="exact", head=True
-        ).eq("user_id", self.dealer_id).eq("status", "active").execute()
+        ).eq("user_id", self.dealer_id).eq("status", "active"))
 
         # Count leads
-        total_leads = supabase.table("leads").select(
+        total_leads = await _execute(supabase.table("leads").select(
             "*", count="exact", head=True
-        ).eq("user_id", self.dealer_id).execute()
+        ).eq("user_id", self.dealer_id))
 
-        new_leads = supabase.table("leads").select(
+        new_leads = await _execute(supabase.table("leads").select(
             "*", count="exact", head=True
-        ).eq("user_id", self.dealer_id).eq("status", "new").execute()
+        ).eq("user_id", self.dealer_id).eq("status", "new"))
 
         today = datetime.utcnow().strftime('%Y-%m-%d')
-        today_leads = supabase.table("leads").select(
+        today_leads = await _execute(supabase.table("leads").select(
             "*", count="exact", head=True
-        ).eq("user_id", self.dealer_id).gte("created_at", today).execute()
+        ).eq("user_id", self.dealer_id).gte("created_at", today))
 
         return (
             f"Inventory: {active_listings.count or 0} active out of {total_listings.count or 0} total listings. "
@@ -1064,86 +1450,82 @@ async def transcribe_call_recording(
     Returns:
         Transcript text or None if failed
     """
-    import httpx
-
     try:
         supabase = get_supabase()
 
         # Mark as processing
-        supabase.table("call_logs").update({
+        await _execute(supabase.table("call_logs").update({
             "transcript_status": "processing"
-        }).eq("id", call_log_id).execute()
+        }).eq("id", call_log_id))
 
         # Download the recording
-        async with httpx.AsyncClient() as client:
-            response = await client.get(recording_url, timeout=60.0)
-            if response.status_code != 200:
-                logger.error(f"Failed to download recording: {response.status_code}")
-                supabase.table("call_logs").update({
-                    "transcript_status": "failed"
-                }).eq("id", call_log_id).execute()
-                return None
+        client = get_http_client()
+        response = await client.get(recording_url, timeout=60.0)
+        if response.status_code != 200:
+            logger.error("Failed to download recording: %s", response.status_code)
+            await _execute(supabase.table("call_logs").update({
+                "transcript_status": "failed"
+            }).eq("id", call_log_id))
+            return None
 
-            audio_data = response.content
+        audio_data = response.content
 
         # Use xAI for transcription via their API
         xai_api_key = os.getenv("XAI_API_KEY")
         if not xai_api_key:
             logger.error("XAI_API_KEY not set for transcription")
-            supabase.table("call_logs").update({
+            await _execute(supabase.table("call_logs").update({
                 "transcript_status": "failed"
-            }).eq("id", call_log_id).execute()
+            }).eq("id", call_log_id))
             return None
 
-        # xAI transcription endpoint
-        async with httpx.AsyncClient() as client:
-            # Upload audio and get transcription
-            response = await client.post(
-                "https://api.x.ai/v1/audio/transcriptions",
-                headers={
-                    "Authorization": f"Bearer {xai_api_key}",
-                },
-                files={
-                    "file": ("recording.mp3", audio_data, "audio/mpeg"),
-                },
-                data={
-                    "model": "whisper-1",  # xAI uses whisper-compatible API
-                },
-                timeout=120.0,
-            )
+        # xAI transcription endpoint - upload audio and get transcription
+        response = await client.post(
+            "https://api.x.ai/v1/audio/transcriptions",
+            headers={
+                "Authorization": f"Bearer {xai_api_key}",
+            },
+            files={
+                "file": ("recording.mp3", audio_data, "audio/mpeg"),
+            },
+            data={
+                "model": "whisper-1",  # xAI uses whisper-compatible API
+            },
+            timeout=120.0,
+        )
 
-            if response.status_code != 200:
-                logger.error(f"Transcription failed: {response.status_code} - {response.text}")
-                supabase.table("call_logs").update({
-                    "transcript_status": "failed"
-                }).eq("id", call_log_id).execute()
-                return None
+        if response.status_code != 200:
+            logger.error("Transcription failed: %s - %s", response.status_code, response.text)
+            await _execute(supabase.table("call_logs").update({
+                "transcript_status": "failed"
+            }).eq("id", call_log_id))
+            return None
 
-            result = response.json()
-            transcript = result.get("text", "")
+        result = response.json()
+        transcript = result.get("text", "")
 
         if transcript:
             # Update call log with transcript
-            supabase.table("call_logs").update({
+            await _execute(supabase.table("call_logs").update({
                 "transcript": transcript,
                 "transcript_status": "completed"
-            }).eq("id", call_log_id).execute()
+            }).eq("id", call_log_id))
 
-            logger.info(f"Transcription completed for call {call_log_id}")
+            logger.info("Transcription completed for call %s", call_log_id)
             return transcript
         else:
-            supabase.table("call_logs").update({
+            await _execute(supabase.table("call_logs").update({
                 "transcript_status": "failed"
-            }).eq("id", call_log_id).execute()
+            }).eq("id", call_log_id))
             return None
 
     except Exception as e:
-        logger.error(f"Error transcribing call: {e}")
+        logger.error("Error transcribing call: %s", e)
         try:
             supabase = get_supabase()
-            supabase.table("call_logs").update({
+            await _execute(supabase.table("call_logs").update({
                 "transcript_status": "failed"
-            }).eq("id", call_log_id).execute()
+            }).eq("id", call_log_id))
         except:
             pass
         return None
@@ -1162,55 +1544,53 @@ async def summarize_call(
     Returns:
         Summary text or None if failed
     """
-    import httpx
-
     try:
         xai_api_key = os.getenv("XAI_API_KEY")
         if not xai_api_key:
             return None
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.x.ai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {xai_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "grok-2-latest",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that summarizes phone calls. Create a brief 2-3 sentence summary of the call, highlighting the caller's main interest and any key outcomes."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Please summarize this phone call transcript:\n\n{transcript[:4000]}"
-                        }
-                    ],
-                    "max_tokens": 200,
-                },
-                timeout=30.0,
-            )
+        client = get_http_client()
+        response = await client.post(
+            "https://api.x.ai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {xai_api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": "grok-2-latest",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a helpful assistant that summarizes phone calls. Create a brief 2-3 sentence summary of the call, highlighting the caller's main interest and any key outcomes."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Please summarize this phone call transcript:\n\n{transcript[:4000]}"
+                    }
+                ],
+                "max_tokens": 200,
+            },
+            timeout=30.0,
+        )
 
-            if response.status_code != 200:
-                logger.error(f"Summary generation failed: {response.status_code}")
-                return None
+        if response.status_code != 200:
+            logger.error("Summary generation failed: %s", response.status_code)
+            return None
 
-            result = response.json()
-            summary = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        result = response.json()
+        summary = result.get("choices", [{}])[0].get("message", {}).get("content", "")
 
-            if summary:
-                supabase = get_supabase()
-                supabase.table("call_logs").update({
-                    "summary": summary
-                }).eq("id", call_log_id).execute()
+        if summary:
+            supabase = get_supabase()
+            await _execute(supabase.table("call_logs").update({
+                "summary": summary
+            }).eq("id", call_log_id))
 
-                logger.info(f"Summary generated for call {call_log_id}")
-                return summary
+            logger.info("Summary generated for call %s", call_log_id)
+            return summary
 
     except Exception as e:
-        logger.error(f"Error generating call summary: {e}")
+        logger.error("Error generating call summary: %s", e)
 
     return None
 
@@ -1247,17 +1627,17 @@ class CallLogTools:
             if dealer_voice_agent_id:
                 log_data["dealer_voice_agent_id"] = dealer_voice_agent_id
 
-            result = supabase.table("call_logs").insert(log_data).execute()
+            result = await _execute(supabase.table("call_logs").insert(log_data))
 
             if result.data:
                 call_log_id = result.data[0].get('id')
-                logger.info(f"Created call log: {call_log_id} for {caller_phone}" +
-                           (f" (dealer: {dealer_id})" if dealer_id else ""))
+                logger.info("Created call log: %s for %s%s", call_log_id, caller_phone,
+                            f" (dealer: {dealer_id})" if dealer_id else "")
                 return call_log_id
             return None
 
         except Exception as e:
-            logger.error(f"Error creating call log: {e}")
+            logger.error("Error creating call log: %s", e)
             return None
 
     async def update_call_log(
@@ -1299,13 +1679,13 @@ class CallLogTools:
             if summary:
                 update_data["summary"] = summary
 
-            result = supabase.table("call_logs").update(update_data).eq("id", call_log_id).execute()
+            result = await _execute(supabase.table("call_logs").update(update_data).eq("id", call_log_id))
 
             if result.data:
-                logger.info(f"Updated call log {call_log_id}")
+                logger.info("Updated call log %s", call_log_id)
                 return True
             return False
 
         except Exception as e:
-            logger.error(f"Error updating call log: {e}")
+            logger.error("Error updating call log: %s", e)
             return False
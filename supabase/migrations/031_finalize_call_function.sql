@@ -0,0 +1,47 @@
+-- Finalize a call in a single round-trip
+-- The voice agent used to issue separate UPDATEs to call_logs and leads at
+-- call teardown; this function performs both in one transaction so teardown
+-- costs one PostgREST round-trip instead of two.
+
+CREATE OR REPLACE FUNCTION finalize_call(
+    p_call_log_id UUID,
+    p_lead_id UUID DEFAULT NULL,
+    p_caller_name TEXT DEFAULT NULL,
+    p_duration_seconds INTEGER DEFAULT NULL,
+    p_recording_url TEXT DEFAULT NULL,
+    p_interest TEXT DEFAULT NULL,
+    p_equipment_type TEXT DEFAULT NULL,
+    p_intent TEXT DEFAULT NULL,
+    p_call_sid TEXT DEFAULT NULL,
+    p_status TEXT DEFAULT 'completed'
+)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    UPDATE call_logs SET
+        status = p_status,
+        ended_at = NOW(),
+        caller_name = COALESCE(p_caller_name, caller_name),
+        duration_seconds = COALESCE(p_duration_seconds, duration_seconds),
+        recording_url = COALESCE(p_recording_url, recording_url),
+        interest = COALESCE(p_interest, interest),
+        equipment_type = COALESCE(p_equipment_type, equipment_type),
+        intent = COALESCE(p_intent, intent),
+        lead_id = COALESCE(p_lead_id, lead_id)
+    WHERE id = p_call_log_id;
+
+    IF p_lead_id IS NOT NULL THEN
+        UPDATE leads SET
+            call_recording_url = COALESCE(p_recording_url, call_recording_url),
+            call_duration_seconds = COALESCE(p_duration_seconds, call_duration_seconds),
+            call_sid = COALESCE(p_call_sid, call_sid)
+        WHERE id = p_lead_id;
+    END IF;
+END;
+$$;
+
+-- Only the agent (service role) calls this
+REVOKE EXECUTE ON FUNCTION finalize_call FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION finalize_call TO service_role;
@@ -0,0 +1,21 @@
+-- Atomic minutes-used increment for dealer voice agents
+-- The agent used to read minutes_used and write it back (two round-trips and
+-- a lost-update race under concurrent call teardowns); a single UPDATE with
+-- the increment applied in SQL fixes both.
+
+CREATE OR REPLACE FUNCTION increment_dealer_agent_minutes(
+    p_agent_id UUID,
+    p_minutes INTEGER
+)
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    UPDATE dealer_voice_agents
+    SET minutes_used = COALESCE(minutes_used, 0) + p_minutes
+    WHERE id = p_agent_id;
+$$;
+
+-- Only the agent (service role) calls this
+REVOKE EXECUTE ON FUNCTION increment_dealer_agent_minutes FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION increment_dealer_agent_minutes TO service_role;
@@ -0,0 +1,34 @@
+-- Capture a listing lead in a single round-trip
+-- The voice agent used to SELECT user_id from the listing and then INSERT
+-- the lead as two sequential PostgREST calls; this function copies the
+-- dealer id from the listing row while inserting, so lead capture costs one
+-- round-trip at the most latency-sensitive moment of the call.
+
+CREATE OR REPLACE FUNCTION insert_lead_for_listing(
+    p_listing_id UUID,
+    p_buyer_name TEXT,
+    p_buyer_phone TEXT,
+    p_buyer_email TEXT DEFAULT '',
+    p_message TEXT DEFAULT NULL,
+    p_intent TEXT DEFAULT NULL,
+    p_equipment_type TEXT DEFAULT NULL
+)
+RETURNS UUID
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    INSERT INTO leads (
+        buyer_name, buyer_phone, buyer_email, message, status,
+        intent, equipment_type, listing_id, user_id, created_at
+    )
+    SELECT
+        p_buyer_name, p_buyer_phone, COALESCE(p_buyer_email, ''), p_message, 'new',
+        p_intent, p_equipment_type, p_listing_id, l.user_id, NOW()
+    FROM listings l
+    WHERE l.id = p_listing_id
+    RETURNING id;
+$$;
+
+-- Only the agent (service role) calls this
+REVOKE EXECUTE ON FUNCTION insert_lead_for_listing FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION insert_lead_for_listing TO service_role;